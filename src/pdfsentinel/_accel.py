@@ -0,0 +1,88 @@
+FLAG_PAGE_TOO_LARGE = 1
+FLAG_IMAGE_TOO_BIG = 2
+FLAG_RASTER_TOO_BIG = 4
+
+
+def _eval_default_kernel(pix_arr, w_pt, h_pt, w_in, h_in, max_page, max_img_px, max_raster):
+    flags = 0
+    if w_pt > max_page or h_pt > max_page:
+        flags |= FLAG_PAGE_TOO_LARGE
+
+    max_img_px_on_page = 0
+    for pix in pix_arr:
+        if pix > max_img_px_on_page:
+            max_img_px_on_page = pix
+    if max_img_px_on_page > max_img_px:
+        flags |= FLAG_IMAGE_TOO_BIG
+
+    raster_est = int(w_in * 300) * int(h_in * 300)
+    if raster_est > max_raster:
+        flags |= FLAG_RASTER_TOO_BIG
+
+    return max_img_px_on_page, raster_est, flags
+
+
+def _eval_default_py(pix_arr, w_pt, h_pt, w_in, h_in, max_page, max_img_px, max_raster):
+    # Without Numba, let NumPy take the max when handed an array
+    if hasattr(pix_arr, "max"):
+        max_img_px_on_page = int(pix_arr.max(initial=0))
+    else:
+        max_img_px_on_page = max(pix_arr, default=0)
+
+    flags = 0
+    if w_pt > max_page or h_pt > max_page:
+        flags |= FLAG_PAGE_TOO_LARGE
+    if max_img_px_on_page > max_img_px:
+        flags |= FLAG_IMAGE_TOO_BIG
+
+    raster_est = int(w_in * 300) * int(h_in * 300)
+    if raster_est > max_raster:
+        flags |= FLAG_RASTER_TOO_BIG
+
+    return max_img_px_on_page, raster_est, flags
+
+
+_compiled = None
+
+
+def _load():
+    # Numba is imported and compiled on first use only: importing it costs
+    # more than most single-file scans
+    global _compiled
+    if _compiled is not None:
+        return _compiled
+
+    _compiled = _eval_default_py
+    try:
+        from numba import njit
+    except ImportError:
+        return _compiled
+
+    try:
+        _compiled = njit(cache=True)(_eval_default_kernel)
+    except Exception:
+        # No writable cache location (read-only installs, containers):
+        # compile in memory instead, or stay on the Python path
+        try:
+            _compiled = njit(_eval_default_kernel)
+        except Exception:
+            _compiled = _eval_default_py
+    return _compiled
+
+
+def numba_enabled():
+    return _load() is not _eval_default_py
+
+
+def eval_default(pix_arr, w_pt, h_pt, w_in, h_in, max_page, max_img_px, max_raster):
+    global _compiled
+    kernel = _load()
+    args = (pix_arr, w_pt, h_pt, w_in, h_in, max_page, max_img_px, max_raster)
+    if kernel is _eval_default_py:
+        return kernel(*args)
+    try:
+        return kernel(*args)
+    except Exception:
+        # A failed JIT compile must not fail the scan
+        _compiled = _eval_default_py
+        return _eval_default_py(*args)
@@ -1,4 +1,9 @@
 from __future__ import annotations
+import mmap
+import os
+import re
+import threading
+from collections import OrderedDict
 import fitz
 from typing import Dict, Any, List
 
@@ -6,22 +11,106 @@ from typing import Dict, Any, List
 fitz.TOOLS.mupdf_display_errors(False)
 fitz.TOOLS.mupdf_display_warnings(False)
 
+_NORMAL_BLENDMODES = frozenset({"Normal", "0", "None"})
+
+# Path construction operators, plus every operator that can pull in content
+# from elsewhere: XObjects (Do), patterns (scn/SCN, tiling cells hold paths)
+# and graphics states (gs, soft masks are groups with their own paths).
+# Matches only whole tokens between PDF delimiters.
+_PATH_OPERATORS = re.compile(
+    rb"(?<![^\s()<>\[\]{}/%])(?:m|l|c|v|y|re|Do|scn|SCN|gs)(?![^\s()<>\[\]{}/%])"
+)
+
+# Documents are cached per thread (PyMuPDF objects must not be shared across
+# threads) and only a couple at a time, so files are not held open for long
+_DOCUMENT_CACHE_SIZE = 2
+_document_cache = threading.local()
+
+def _open_mapped(path: str, size: int) -> fitz.Document:
+    if size == 0 or not path.lower().endswith(".pdf"):
+        # mmap refuses empty files, and other formats need MuPDF to pick the
+        # handler from the file name; both go through the regular open
+        return fitz.open(path)
+
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        # Unreadable; MuPDF reports it the same way it always has
+        return fitz.open(path)
+    try:
+        mm = mmap.mmap(fd, size, access=mmap.ACCESS_READ)
+    finally:
+        os.close(fd)
+
+    if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+        # Pages are walked in order, so let the kernel read ahead
+        mm.madvise(mmap.MADV_SEQUENTIAL)
+
+    doc = fitz.open(stream=memoryview(mm), filetype="pdf")
+    doc._mm = mm
+    return doc
+
 def open_document(path: str) -> fitz.Document:
-    return fitz.open(path)
+    try:
+        size = os.stat(path).st_size
+    except OSError:
+        return fitz.open(path)
+    return _open_mapped(os.path.abspath(os.fspath(path)), size)
+
+def _thread_documents() -> OrderedDict:
+    # A forked child inherits the parent's thread-local; start it afresh
+    if getattr(_document_cache, "pid", None) != os.getpid():
+        _document_cache.pid = os.getpid()
+        _document_cache.docs = OrderedDict()
+    return _document_cache.docs
+
+def open_document_cached(path: str) -> fitz.Document:
+    try:
+        st = os.stat(path)
+    except OSError:
+        # Nothing to cache; let MuPDF raise its usual error for the path
+        return fitz.open(path)
+    path = os.path.abspath(os.fspath(path))
+    # mtime/size invalidate the entry when the file is rewritten
+    key = (path, st.st_mtime_ns, st.st_size)
+
+    docs = _thread_documents()
+    doc = docs.get(key)
+    if doc is not None:
+        docs.move_to_end(key)
+        return doc
+
+    doc = _open_mapped(path, st.st_size)
+    docs[key] = doc
+    while len(docs) > _DOCUMENT_CACHE_SIZE:
+        _, evicted = docs.popitem(last=False)
+        evicted.close()
+    return doc
+
+def clear_document_cache() -> None:
+    docs = _thread_documents()
+    while docs:
+        _, doc = docs.popitem()
+        doc.close()
+
+def open_stream(data: bytes, path: str = "") -> fitz.Document:
+    # Same format choice as opening by path: from the suffix, PDF if none
+    filetype = os.path.splitext(os.fspath(path))[1].lstrip(".").lower() or "pdf"
+    return fitz.open(stream=data, filetype=filetype)
 
 def load_page(doc: fitz.Document, index: int) -> fitz.Page:
     return doc.load_page(index)
 
 def get_physical_metrics(page: fitz.Page) -> Dict[str, Any]:
-    rect = page.rect
-    mediabox = page.mediabox
+    # bound() is what page.rect resolves to (rotation already applied)
+    rect = page.bound()
+    width = float(rect.width)
+    height = float(rect.height)
     return {
-        "width_pt": float(rect.width),
-        "height_pt": float(rect.height),
-        "width_in": float(rect.width / 72.0),
-        "height_in": float(rect.height / 72.0),
-        "mediabox_width": float(mediabox.width),
-        "mediabox_height": float(mediabox.height),
+        "width_pt": width,
+        "height_pt": height,
+        "width_in": width / 72.0,
+        "height_in": height / 72.0,
         "rotation": int(page.rotation),
         "user_unit": float(getattr(page, "user_unit", 1.0))
     }
@@ -39,30 +128,48 @@ def get_image_metadata(page: fitz.Page) -> List[Dict[str, Any]]:
             # Defensive extraction: if img[5] (colorspace) is a broken xref, 
             # we cast to string and catch the fail.
             cs_name = str(img[5]) if img[5] is not None else "Unknown"
-            
+
+            # PyMuPDF already returns ints here; only guard against None
+            w = img[2] or 0
+            h = img[3] or 0
             image_info.append({
-                "xref": int(img[0] or 0),
-                "smask_xref": int(img[1] or 0),
-                "width": int(img[2] or 0),
-                "height": int(img[3] or 0),
-                "bpc": int(img[4] or 8),
+                "xref": img[0] or 0,
+                "smask_xref": img[1] or 0,
+                "width": w,
+                "height": h,
+                "bpc": img[4] or 8,
                 "colorspace_name": cs_name,
-                "pixel_count": int((img[2] or 0) * (img[3] or 0)),
+                "pixel_count": w * h,
                 "is_inline": img[0] == 0
             })
         except (IndexError, TypeError, ValueError):
             continue
     return image_info
 
-def get_vector_dna(page: fitz.Page) -> Dict[str, Any]:
+def _may_have_paths(page: fitz.Page) -> bool:
+    # Cheap sniff of the raw content streams; any doubt falls through to MuPDF
     try:
-        drawings = page.get_drawings()
+        # Annotation and widget appearance streams are drawn by MuPDF too
+        if page.first_annot is not None or page.first_widget is not None:
+            return True
+
+        xrefs = page.get_contents()
+        if not xrefs:
+            return False
+
+        # Type3 glyphs are drawn as paths from the font's own procedures
+        if any(f[2] == "Type3" for f in page.get_fonts()):
+            return True
+
+        doc = page.parent
+        return any(_PATH_OPERATORS.search(doc.xref_stream(x) or b"") for x in xrefs)
     except Exception:
-        # Return empty stats if drawings fail to parse entirely
-        return {"path_count": 0, "total_points": 0, "error": "parse_failure"}
+        # Non-PDF pages or broken objects: leave the verdict to get_cdrawings
+        return True
 
-    stats = {
-        "path_count": len(drawings),
+def _vector_stats(path_count: int) -> Dict[str, Any]:
+    return {
+        "path_count": path_count,
         "total_points": 0,
         "curve_segments": 0,
         "rect_segments": 0,
@@ -72,74 +179,115 @@ def get_vector_dna(page: fitz.Page) -> Dict[str, Any]:
         "has_blend_modes": False,
         "has_tiling_patterns": False,
         "has_even_odd_winding": False,
-        "max_stroke_width": 0.0
+        "max_stroke_width": 0.0,
+        "error": None
     }
 
+def get_vector_dna(page: fitz.Page, detail: bool = False) -> Dict[str, Any]:
+    try:
+        # Text- or image-only pages skip the content-stream interpretation
+        if not _may_have_paths(page):
+            return _vector_stats(0)
+
+        # Raw C-level dicts: no Rect/Point re-wrapping of every path item
+        drawings = page.get_cdrawings()
+    except Exception:
+        # Return empty stats if drawings fail to parse entirely
+        return {"path_count": 0, "total_points": 0, "error": "parse_failure"}
+
+    stats = _vector_stats(len(drawings))
+
+    # Only path_count feeds the safety rules; the geometry walk is opt-in
+    if not detail:
+        return stats
+
+    # Accumulate in locals and write back once: avoids a dict subscript per op
+    total_points = curve_segments = rect_segments = clipping_paths = total_paint_ops = 0
+    has_transparency = has_blend_modes = has_tiling_patterns = has_even_odd_winding = False
+    max_stroke_width = 0.0
+    get = dict.get
+
     for d in drawings:
+        fill = get(d, "fill")
+        color = get(d, "color")
+
         # Paint Ops
-        if d.get("fill") is not None: stats["total_paint_ops"] += 1
-        if d.get("stroke") is not None or d.get("color") is not None: stats["total_paint_ops"] += 1
-        
+        if fill is not None: total_paint_ops += 1
+        if get(d, "stroke") is not None or color is not None: total_paint_ops += 1
+
         # Transparency with None guards
-        f_op = d.get("fill_opacity")
-        s_op = d.get("stroke_opacity")
+        f_op = get(d, "fill_opacity")
+        s_op = get(d, "stroke_opacity")
         fill_val = float(f_op) if f_op is not None else 1.0
         stroke_val = float(s_op) if s_op is not None else 1.0
-        
+
         if fill_val < 0.999 or stroke_val < 0.999:
-            stats["has_transparency"] = True
-        
-        # Blend Modes - string cast handles broken refs
-        bm = d.get("blendmode")
-        if bm is not None:
-            if str(bm) not in ("Normal", "0", "None"):
-                stats["has_blend_modes"] = True
-            
-        if d.get("even_odd") is True:
-            stats["has_even_odd_winding"] = True
-        
-        if d.get("seqno", 0) is not None and int(d.get("seqno", 0)) < 0:
-            stats["has_tiling_patterns"] = True
-
-        for item in d.get("items", []):
-            try:
-                t = item[0]
-                if t == "l": stats["total_points"] += 2
-                elif t in ("c", "q"): 
-                    stats["total_points"] += 4
-                    stats["curve_segments"] += 1
-                elif t == "re": 
-                    stats["total_points"] += 4
-                    stats["rect_segments"] += 1
-                    if d.get("fill") is None and d.get("color") is None:
-                        stats["clipping_paths"] += 1
-            except (IndexError, TypeError):
+            has_transparency = True
+
+        # Blend Modes - MuPDF reports the name as a plain string
+        bm = get(d, "blendmode")
+        if bm is not None and bm not in _NORMAL_BLENDMODES:
+            has_blend_modes = True
+
+        if get(d, "even_odd"):
+            has_even_odd_winding = True
+
+        seqno = get(d, "seqno", 0)
+        if seqno is not None and int(seqno) < 0:
+            has_tiling_patterns = True
+
+        # MuPDF items are non-empty tuples; skipping empties is all the
+        # guarding needed, so no exception handling in the hot loop
+        for item in get(d, "items", ()):
+            if not item:
                 continue
-        
-        raw_w = d.get("width")
+            t = item[0]
+            if t == "l": total_points += 2
+            elif t == "c" or t == "q":
+                total_points += 4
+                curve_segments += 1
+            elif t == "re":
+                total_points += 4
+                rect_segments += 1
+                if fill is None and color is None:
+                    clipping_paths += 1
+
+        raw_w = get(d, "width")
         sw = float(raw_w) if raw_w is not None else 1.0
-        if sw > stats["max_stroke_width"]: stats["max_stroke_width"] = sw
-    
+        if sw > max_stroke_width: max_stroke_width = sw
+
+    stats["total_points"] = total_points
+    stats["curve_segments"] = curve_segments
+    stats["rect_segments"] = rect_segments
+    stats["clipping_paths"] = clipping_paths
+    stats["total_paint_ops"] = total_paint_ops
+    stats["has_transparency"] = has_transparency
+    stats["has_blend_modes"] = has_blend_modes
+    stats["has_tiling_patterns"] = has_tiling_patterns
+    stats["has_even_odd_winding"] = has_even_odd_winding
+    stats["max_stroke_width"] = max_stroke_width
+
     return stats
 
 def get_text_metadata(page: fitz.Page) -> Dict[str, Any]:
     try:
         fonts = page.get_fonts()
-        text_dict = page.get_text("dict")
+        text = page.get_text("text")
     except Exception:
         return {"font_count": 0, "char_count": 0, "error": "parse_failure"}
 
-    char_count = 0
-    for block in text_dict.get("blocks", []):
-        if "lines" in block:
-            for line in block["lines"]:
-                for span in line["spans"]:
-                    txt = span.get("text")
-                    if txt:
-                        char_count += len(txt)
+    # Plain text avoids building the span dicts; drop the line breaks it
+    # inserts so the count matches the summed span lengths of "dict" mode
+    char_count = len(text) - text.count("\n")
+
+    # One substring scan over all font names; NUL keeps names from running together
+    is_cjk = False
+    if fonts:
+        blob = "\x00".join(str(f[3]) for f in fonts)
+        is_cjk = "CJK" in blob or "Identity-" in blob
 
     return {
         "font_count": len(fonts),
         "char_count": char_count,
-        "is_complex_font_system": any("CJK" in str(f[3]) or "Identity-" in str(f[3]) for f in fonts)
+        "is_complex_font_system": is_cjk
     }
\ No newline at end of file
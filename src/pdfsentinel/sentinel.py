@@ -1,8 +1,121 @@
 import json
+import os
+import queue
+import sys
+import threading
+import types
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
+from . import _accel
 from .helper import pymupdf
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Error tag names, defined once so every rule spells them the same way
+_ERR_PAGE_TOO_LARGE = sys.intern("page_too_large")
+_ERR_IMAGE_TOO_BIG = sys.intern("embedded_image_too_big")
+_ERR_IMAGE_TOO_BIG_PIXELS = sys.intern("embedded_image_too_big_pixels")
+_ERR_RASTER_TOO_BIG = sys.intern("raster_estimate_too_big")
+_ERR_VECTOR_PARSE = sys.intern("vector_parse_failure")
+_ERR_TOO_MANY_VECTOR_OPS = sys.intern("too_many_vector_ops")
+_ERR_TEXT_PARSE = sys.intern("text_parse_failure")
+_ERR_INVALID_PAGE = sys.intern("invalid_page")
+
+# Below this many images the array setup costs more than the Python loop
+_NUMPY_MIN_IMAGES = 64
+
+
+def _dumps(obj):
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, indent=4, ensure_ascii=False)
+
+
+def _pixel_counts(images):
+    # The compiled evaluator needs a typed array; plain NumPy only pays off on big pages
+    if np is not None and (_accel.numba_enabled() or len(images) >= _NUMPY_MIN_IMAGES):
+        return np.fromiter(
+            (img.get("pixel_count") or 0 for img in images),
+            dtype=np.int64,
+            count=len(images),
+        )
+    return [int(img.get("pixel_count") or 0) for img in images]
+
+
+def _oversized_images(pix, max_image_pixels):
+    if np is not None and isinstance(pix, np.ndarray):
+        return np.flatnonzero(pix > max_image_pixels).tolist()
+    return [i for i, p in enumerate(pix) if p > max_image_pixels]
+
+
+def _analyze_page_worker(doc_path, page_index, cfg, adv, mode="full"):
+    sentinel = PDFSentinel()
+    doc = pymupdf.open_document_cached(doc_path)
+    return sentinel._analyze_page(
+        doc_path, doc, page_index, cfg, adv, include_file_name=False, mode=mode
+    )
+
+
+def _analyze_file_worker(file_path, data, cfg, adv):
+    sentinel = PDFSentinel()
+    # The document only exists in memory here, so pages cannot fan out further
+    doc = pymupdf.open_stream(data, file_path)
+    return sentinel._file_analysis_response(file_path, doc, cfg, adv, num_workers=1)
+
+
+def _prefetch_files(file_paths, in_flight):
+    # Reads run on a background thread (file I/O releases the GIL) so the
+    # next files are already in memory while the current one is parsed.
+    buffered = queue.Queue(maxsize=in_flight)
+    stop = threading.Event()
+    done = object()
+
+    def _put(item):
+        while not stop.is_set():
+            try:
+                buffered.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _reader():
+        # Any failure is handed to the consumer, and done is always queued,
+        # so the consumer can never block on a dead reader
+        try:
+            for path in file_paths:
+                if stop.is_set():
+                    return
+                _put((path, Path(path).read_bytes(), None))
+        except BaseException as exc:
+            _put((None, None, exc))
+        finally:
+            _put(done)
+
+    reader = threading.Thread(target=_reader, name="pdfsentinel-prefetch", daemon=True)
+    reader.start()
+    try:
+        while True:
+            item = buffered.get()
+            if item is done:
+                return
+            path, data, exc = item
+            if exc is not None:
+                raise exc
+            yield path, data
+    finally:
+        stop.set()
+
 
 class PDFSentinel:
     DEFAULT_CONFIG = {
@@ -10,6 +123,7 @@ class PDFSentinel:
         "max_image_pixels": 20_000_000,
         "max_vectors_operations": 1500,
         "max_raster_pixels": 30_000_000,
+        "need_vector_detail": False,
     }
 
     ADVANCED_DEFAULT_CONFIG = {
@@ -21,10 +135,21 @@ class PDFSentinel:
         "rss_img_smask_max": 0,
     }
 
+    # In-process by default: spinning up a pool costs more than it saves on
+    # typical files, and it needs a __main__ guard under spawn
+    DEFAULT_NUM_WORKERS = 1
+    WORKER_CHUNKSIZE = 4
+    DEFAULT_IN_FLIGHT = 8
+
     def __init__(self, base_config=None):
         self.base_config = self._merge_config(self.DEFAULT_CONFIG, base_config or {})
         self.advanced_config = dict(self.ADVANCED_DEFAULT_CONFIG)
 
+    def _advanced_namespace(self):
+        # Snapshot per call, so later edits to advanced_config are honoured and
+        # the per-page evaluator reads plain attributes
+        return types.SimpleNamespace(**self.advanced_config)
+
     @staticmethod
     def _merge_config(base, override):
         cfg = dict(base)
@@ -38,46 +163,39 @@ class PDFSentinel:
 
         page_width_pt = float(physical.get("width_pt", 0.0))
         page_height_pt = float(physical.get("height_pt", 0.0))
-
-        max_page_size = float(config["max_page_size"])
-        if page_width_pt > max_page_size or page_height_pt > max_page_size:
-            errors.append(f"page_too_large:{page_width_pt:.1f}x{page_height_pt:.1f}_pt")
-
         max_image_pixels = int(config["max_image_pixels"])
-        max_img_px_on_page = 0
 
-        for img in images:
-            pix = int(img.get("pixel_count") or 0)
-            if pix > max_img_px_on_page:
-                max_img_px_on_page = pix
-
-            if pix > max_image_pixels:
+        pix = _pixel_counts(images)
+        max_img_px_on_page, est_pixels, flags = _accel.eval_default(
+            pix,
+            page_width_pt,
+            page_height_pt,
+            float(physical.get("width_in", 0.0)),
+            float(physical.get("height_in", 0.0)),
+            float(config["max_page_size"]),
+            max_image_pixels,
+            int(config["max_raster_pixels"]),
+        )
+        max_img_px_on_page = int(max_img_px_on_page)
+        est_pixels = int(est_pixels)
+
+        if flags & _accel.FLAG_PAGE_TOO_LARGE:
+            errors.append(f"{_ERR_PAGE_TOO_LARGE}:{page_width_pt:.1f}x{page_height_pt:.1f}_pt")
+
+        if flags & _accel.FLAG_IMAGE_TOO_BIG:
+            for i in _oversized_images(pix, max_image_pixels):
+                img = images[i]
                 w = int(img.get("width") or 0)
                 h = int(img.get("height") or 0)
                 if w and h:
-                    errors.append(f"embedded_image_too_big:{w}x{h}")
+                    errors.append(f"{_ERR_IMAGE_TOO_BIG}:{w}x{h}")
                 else:
-                    errors.append(f"embedded_image_too_big_pixels:{pix}")
-
-        vector_path_count = int(vector.get("path_count") or 0)
-        if vector.get("error"):
-            errors.append(f"vector_parse_failure:{vector.get('error')}")
-
-        max_vectors_operations = int(config["max_vectors_operations"])
-        if vector_path_count > max_vectors_operations:
-            errors.append(f"too_many_vector_ops:{vector_path_count}")
-
-        if text.get("error"):
-            errors.append(f"text_parse_failure:{text.get('error')}")
-
-        width_in = float(physical.get("width_in", 0.0))
-        height_in = float(physical.get("height_in", 0.0))
+                    errors.append(f"{_ERR_IMAGE_TOO_BIG_PIXELS}:{int(pix[i])}")
 
-        est_pixels = int(width_in * 300) * int(height_in * 300)
+        errors.extend(self._evaluate_content_default(vector, text, config))
 
-        max_raster_pixels = int(config["max_raster_pixels"])
-        if est_pixels > max_raster_pixels:
-            errors.append(f"raster_estimate_too_big:{est_pixels}")
+        if flags & _accel.FLAG_RASTER_TOO_BIG:
+            errors.append(f"{_ERR_RASTER_TOO_BIG}:{est_pixels}")
 
         return {
             "errors": errors,
@@ -85,24 +203,39 @@ class PDFSentinel:
                 "page_width_pt": page_width_pt,
                 "page_height_pt": page_height_pt,
                 "max_embedded_image_pixels": max_img_px_on_page,
-                "vector_path_count": vector_path_count,
+                "vector_path_count": int(vector.get("path_count") or 0),
                 "raster_estimate_pixels_300dpi": est_pixels,
             },
         }
 
-    def _evaluate_page_advanced(self, physical, images):
-        errors_adv = []
+    @staticmethod
+    def _evaluate_content_default(vector, text, config):
+        errors = []
 
-        cfg = self.advanced_config
+        vector_path_count = int(vector.get("path_count") or 0)
+        if vector.get("error"):
+            errors.append(f"{_ERR_VECTOR_PARSE}:{vector.get('error')}")
+
+        max_vectors_operations = int(config["max_vectors_operations"])
+        if vector_path_count > max_vectors_operations:
+            errors.append(f"{_ERR_TOO_MANY_VECTOR_OPS}:{vector_path_count}")
+
+        if text.get("error"):
+            errors.append(f"{_ERR_TEXT_PARSE}:{text.get('error')}")
+
+        return errors
+
+    def _evaluate_page_advanced(self, physical, images, adv):
+        errors_adv = []
 
         w = float(physical.get("width_pt", 0.0) or 0.0)
         h = float(physical.get("height_pt", 0.0) or 0.0)
         physical_max_dim = max(w, h)
 
-        if physical_max_dim >= cfg["render_max_dim"]:
+        if physical_max_dim >= adv.render_max_dim:
             errors_adv.append("render:physical_max_dim>=2400")
 
-        if w >= cfg["rss_width_huge"]:
+        if w >= adv.rss_width_huge:
             errors_adv.append("rss:physical_mediabox_width>=1650")
 
         img_count = len(images)
@@ -125,11 +258,11 @@ class PDFSentinel:
                 img_smask_count += 1
 
         if (
-            img_count >= cfg["rss_img_count"]
-            and img_smask_count <= cfg["rss_img_smask_max"]
+            img_count >= adv.rss_img_count
+            and img_smask_count <= adv.rss_img_smask_max
             and (
-                img_total_pixels >= cfg["rss_img_total_pixels"]
-                or img_max_pixels >= cfg["rss_img_max_pixels"]
+                img_total_pixels >= adv.rss_img_total_pixels
+                or img_max_pixels >= adv.rss_img_max_pixels
             )
         ):
             errors_adv.append(
@@ -138,12 +271,17 @@ class PDFSentinel:
 
         return {"errors_advanced": errors_adv}
 
-    def _analyze_page(self, doc_path, doc, page_index, config, include_file_name=True):
+    def _analyze_page(self, doc_path, doc, page_index, config, adv, include_file_name=True, mode="full"):
         page = pymupdf.load_page(doc, page_index)
 
+        if mode == "safety_only":
+            return self._analyze_page_safety(page, page_index, config, adv)
+
+        # Kept serial on purpose: PyMuPDF is not thread-safe and these calls
+        # share one page/document, so parallelism lives at process level.
         physical = pymupdf.get_physical_metrics(page)
         images = pymupdf.get_image_metadata(page)
-        vector = pymupdf.get_vector_dna(page)
+        vector = pymupdf.get_vector_dna(page, detail=bool(config["need_vector_detail"]))
         text = pymupdf.get_text_metadata(page)
 
         default_eval = self._evaluate_page_default(physical, images, vector, text, config)
@@ -151,7 +289,7 @@ class PDFSentinel:
         summary = default_eval["summary"]
         is_page_safe = len(errors) == 0
 
-        adv_eval = self._evaluate_page_advanced(physical, images)
+        adv_eval = self._evaluate_page_advanced(physical, images, adv)
         errors_adv = adv_eval["errors_advanced"]
         is_page_safe_adv = len(errors_adv) == 0
 
@@ -175,27 +313,61 @@ class PDFSentinel:
 
         return data
 
-    def file_analysis(self, file_path, config=None, json_response=False):
-        cfg = self._merge_config(self.base_config, config or {})
-        doc = pymupdf.open_document(file_path)
+    def _analyze_page_safety(self, page, page_index, config, adv):
+        physical = pymupdf.get_physical_metrics(page)
+        images = pymupdf.get_image_metadata(page)
 
+        # Size, image and raster rules need no content parsing: once one of
+        # them trips, the vector and text passes cannot change the verdict.
+        errors = self._evaluate_page_default(physical, images, {}, {}, config)["errors"]
+        if not errors:
+            vector = pymupdf.get_vector_dna(page)
+            text = pymupdf.get_text_metadata(page)
+            errors = self._evaluate_content_default(vector, text, config)
+
+        errors_adv = self._evaluate_page_advanced(physical, images, adv)["errors_advanced"]
+
+        return page_index + 1, errors, errors_adv
+
+    def _analyze_pages(self, file_path, doc, total_pages, cfg, adv, num_workers=None, mode="full"):
+        workers = self.DEFAULT_NUM_WORKERS if num_workers is None else int(num_workers)
+        workers = min(workers, total_pages)
+
+        if workers <= 1:
+            for idx in range(total_pages):
+                yield self._analyze_page(file_path, doc, idx, cfg, adv, include_file_name=False, mode=mode)
+            return
+
+        worker = partial(
+            _analyze_page_worker,
+            file_path,
+            cfg=cfg,
+            adv=adv,
+            mode=mode,
+        )
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(worker, range(total_pages), chunksize=self.WORKER_CHUNKSIZE)
+
+    def _iter_page_safety(self, doc_path, doc, total_pages, cfg, adv, num_workers=None):
+        # Yields (page, errors, errors_advanced) without any metrics payload
+        yield from self._analyze_pages(
+            doc_path, doc, total_pages, cfg, adv, num_workers, mode="safety_only"
+        )
+
+    def _file_analysis_response(self, file_path, doc, cfg, adv, num_workers=None):
         total_pages = int(getattr(doc, "page_count", 0) or 0)
 
+        # Classify pages as they stream in instead of re-walking results
         results = []
-        for idx in range(total_pages):
-            results.append(self._analyze_page(file_path, doc, idx, cfg, include_file_name=False))
-
-        unsafe_pages = [
-            str(p["page"])
-            for p in results
-            if not p["is_page_safety"]
-        ]
-
-        unsafe_pages_adv = [
-            str(p["page"])
-            for p in results
-            if not p["is_page_safety_advanced"]
-        ]
+        unsafe_pages = []
+        unsafe_pages_adv = []
+        append_result = results.append
+        for r in self._analyze_pages(file_path, doc, total_pages, cfg, adv, num_workers):
+            append_result(r)
+            if not r["is_page_safety"]:
+                unsafe_pages.append(str(r["page"]))
+            if not r["is_page_safety_advanced"]:
+                unsafe_pages_adv.append(str(r["page"]))
 
         response = {
             "file_name": str(Path(file_path).name),
@@ -210,11 +382,54 @@ class PDFSentinel:
             "results": results,
         }
 
-        return json.dumps(response, indent=4, ensure_ascii=False) if json_response else response
+        return response
 
-    def page_analysis(self, file_path, page, config=None, json_response=False):
+    def file_analysis(self, file_path, config=None, json_response=False, num_workers=None):
         cfg = self._merge_config(self.base_config, config or {})
         doc = pymupdf.open_document(file_path)
+
+        response = self._file_analysis_response(
+            file_path, doc, cfg, self._advanced_namespace(), num_workers
+        )
+        return _dumps(response) if json_response else response
+
+    def files_analysis(self, file_paths, config=None, json_response=False, num_workers=None, in_flight=None):
+        cfg = self._merge_config(self.base_config, config or {})
+        in_flight = max(self.DEFAULT_IN_FLIGHT if in_flight is None else int(in_flight), 1)
+        workers = self.DEFAULT_NUM_WORKERS if num_workers is None else int(num_workers)
+        adv = self._advanced_namespace()
+
+        file_paths = list(file_paths)
+        responses = []
+
+        if workers <= 1:
+            for path, data in _prefetch_files(file_paths, in_flight):
+                doc = pymupdf.open_stream(data, path)
+                responses.append(self._file_analysis_response(path, doc, cfg, adv, num_workers=1))
+            return _dumps(responses) if json_response else responses
+
+        # Files are parsed one per worker; at most in_flight buffers are
+        # pending so memory stays bounded on large batches.
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Start the workers before the reader thread exists: forking a
+            # process that is running other threads can deadlock
+            executor.submit(os.getpid).result()
+
+            for path, data in _prefetch_files(file_paths, in_flight):
+                if len(pending) >= in_flight:
+                    responses.append(pending.popleft().result())
+                pending.append(
+                    executor.submit(_analyze_file_worker, path, data, cfg, adv)
+                )
+            while pending:
+                responses.append(pending.popleft().result())
+
+        return _dumps(responses) if json_response else responses
+
+    def page_analysis(self, file_path, page, config=None, json_response=False):
+        cfg = self._merge_config(self.base_config, config or {})
+        doc = pymupdf.open_document_cached(file_path)
         total_pages = int(getattr(doc, "page_count", 0) or 0)
 
         if page < 1 or page > total_pages:
@@ -222,9 +437,9 @@ class PDFSentinel:
                 "file_name": str(Path(file_path).name),
                 "page": page,
                 "is_page_safety": False,
-                "errors": [f"invalid_page:{page}"],
+                "errors": [f"{_ERR_INVALID_PAGE}:{page}"],
                 "is_page_safety_advanced": False,
-                "errors_advanced": [f"invalid_page:{page}"],
+                "errors_advanced": [f"{_ERR_INVALID_PAGE}:{page}"],
                 "metrics": {"physical": {}, "images": [], "vector": {}, "text": {}},
                 "summary": {
                     "page_width_pt": 0.0,
@@ -234,36 +449,41 @@ class PDFSentinel:
                     "raster_estimate_pixels_300dpi": 0,
                 },
             }
-            return json.dumps(result, indent=4, ensure_ascii=False) if json_response else result
+            return _dumps(result) if json_response else result
+
+        result = self._analyze_page(
+            file_path, doc, page - 1, cfg, self._advanced_namespace(), include_file_name=True
+        )
+        return _dumps(result) if json_response else result
 
-        result = self._analyze_page(file_path, doc, page - 1, cfg, include_file_name=True)
-        return json.dumps(result, indent=4, ensure_ascii=False) if json_response else result
+    def is_file_safe(self, file_path, config=None, json_response=False, num_workers=None):
+        cfg = self._merge_config(self.base_config, config or {})
+        doc = pymupdf.open_document(file_path)
 
-    def is_file_safe(self, file_path, config=None, json_response=False):
-        analysis = self.file_analysis(file_path, config, json_response=False)
-        unsafety_pages = [
-            {"page": r["page"], "errors": r["errors"]}
-            for r in analysis["results"]
-            if not r["is_page_safety"]
-        ]
+        total_pages = int(getattr(doc, "page_count", 0) or 0)
 
-        unsafety_pages_adv = [
-            {"page": r["page"], "errors_advanced": r.get("errors_advanced", [])}
-            for r in analysis["results"]
-            if not r.get("is_page_safety_advanced", True)
-        ]
+        unsafety_pages = []
+        unsafety_pages_adv = []
+        adv = self._advanced_namespace()
+        for page, errors, errors_adv in self._iter_page_safety(
+            file_path, doc, total_pages, cfg, adv, num_workers
+        ):
+            if errors:
+                unsafety_pages.append({"page": page, "errors": errors})
+            if errors_adv:
+                unsafety_pages_adv.append({"page": page, "errors_advanced": errors_adv})
 
         result = {
-            "file_name": analysis["file_name"],
-            "pages": analysis["pages"],
+            "file_name": str(Path(file_path).name),
+            "pages": total_pages,
             "is_file_safety": len(unsafety_pages) == 0,
             "unsafety_pages": unsafety_pages,
             "is_file_safety_advanced": len(unsafety_pages_adv) == 0,
             "unsafety_pages_advanced": unsafety_pages_adv,
         }
 
-        return json.dumps(result, indent=4, ensure_ascii=False) if json_response else result
+        return _dumps(result) if json_response else result
 
     def is_page_safe(self, file_path, page, config=None, json_response=False):
         result = self.page_analysis(file_path, page, config, json_response=False)
-        return json.dumps(result, indent=4, ensure_ascii=False) if json_response else result
+        return _dumps(result) if json_response else result